@@ -2,9 +2,27 @@ from django.contrib import admin
 
 from .models import Comment, Post, Rating, Topic
 
+
+class TopicAdmin(admin.ModelAdmin):
+    """
+    Admin for topics. A topic's id is derived from its title, so the title
+    can only be set when the topic is created.
+    """
+
+    def get_readonly_fields(self, request, obj=None):
+        """
+        Makes the title read only when changing an existing topic.
+        """
+
+        if obj is not None:
+            return ('title',)
+
+        return ()
+
+
 # register models with django admin
 
 admin.site.register(Post)
-admin.site.register(Topic)
+admin.site.register(Topic, TopicAdmin)
 admin.site.register(Rating)
 admin.site.register(Comment)
@@ -0,0 +1,21 @@
+# Generated by Django 3.0.2 on 2026-10-15 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['expiry_date'], name='api_post_expiry__37ea65_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['post', 'rating'], name='api_rating_post_id_60bd60_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Replaces the title primary key of Topic with a small integer id.
+#
+# The posts' topics are copied across to a new Topic table keyed by id,
+# after which the old table is dropped and the new one takes its name.
+
+from django.db import migrations, models
+
+
+# the ids the topics had when this migration was written
+TOPIC_IDS = {
+    'politics': 1,
+    'health': 2,
+    'sport': 3,
+    'tech': 4,
+}
+
+
+def copy_topics_forwards(apps, schema_editor):
+    Topic = apps.get_model('api', 'Topic')
+    NewTopic = apps.get_model('api', 'NewTopic')
+    Post = apps.get_model('api', 'Post')
+
+    for topic in Topic.objects.all():
+        NewTopic.objects.create(id=TOPIC_IDS[topic.title], title=topic.title)
+
+    for post in Post.objects.prefetch_related('topics'):
+        post.new_topics.set([TOPIC_IDS[topic.title] for topic in post.topics.all()])
+
+
+def copy_topics_backwards(apps, schema_editor):
+    Topic = apps.get_model('api', 'Topic')
+    NewTopic = apps.get_model('api', 'NewTopic')
+    Post = apps.get_model('api', 'Post')
+
+    for topic in NewTopic.objects.all():
+        Topic.objects.create(title=topic.title)
+
+    for post in Post.objects.prefetch_related('new_topics'):
+        post.topics.set([topic.title for topic in post.new_topics.all()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_post_rating_indexes'),
+        # renaming NewTopic also renames its content type, which needs the
+        # final content type schema
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewTopic',
+            fields=[
+                ('id', models.SmallIntegerField(editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(choices=[('politics', 'Politics'), ('health', 'Health'), ('sport', 'Sport'), ('tech', 'Tech')], max_length=8, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='new_topics',
+            field=models.ManyToManyField(to='api.NewTopic'),
+        ),
+        migrations.RunPython(copy_topics_forwards, copy_topics_backwards),
+        migrations.RemoveField(
+            model_name='post',
+            name='topics',
+        ),
+        migrations.DeleteModel(
+            name='Topic',
+        ),
+        migrations.RenameModel(
+            old_name='NewTopic',
+            new_name='Topic',
+        ),
+        migrations.RenameField(
+            model_name='post',
+            old_name='new_topics',
+            new_name='topics',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.0.2 on 2026-10-15 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_topic_smallint_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['date_created'], name='api_post_date_cr_fd0f89_idx'),
+        ),
+    ]
@@ -8,7 +8,8 @@ class Topic(models.Model):
 
     """
     
-    # types of topic objects that can be created
+    # types of topic objects that can be created.
+    # each type's id is its position in this list, so new types must be added to the end
     TYPES = [
         ('politics', 'Politics'),
         ('health', 'Health'),
@@ -16,12 +17,33 @@ class Topic(models.Model):
         ('tech', 'Tech'),
     ]
 
-    title = models.CharField(primary_key=True, max_length=8, choices=TYPES)
+    # the id is always derived from the title, see save()
+    id = models.SmallIntegerField(primary_key=True, editable=False)
+    title = models.CharField(unique=True, max_length=8, choices=TYPES)
+
+    def save(self, *args, **kwargs):
+        """
+        Sets the id that belongs to the topic's title before saving the topic.
+        The title of an existing topic cannot be changed, as that would change its id.
+        """
+
+        topic_id = TOPIC_IDS[self.title]
+
+        if not self._state.adding and self.id != topic_id:
+            raise ValueError('The title of an existing topic cannot be changed.')
+
+        self.id = topic_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
 
+# small integer ids for each type of topic, keeping the table linking posts
+# and topics (and its indexes) compact
+TOPIC_IDS = {title: topic_id for topic_id, (title, _) in enumerate(Topic.TYPES, start=1)}
+
+
 class Post(models.Model):
     """
     The database model representing posts.
@@ -37,6 +59,13 @@ class Post(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     expiry_date = models.DateTimeField()
 
+    class Meta:
+        # posts are filtered on whether they have expired and paginated by date created
+        indexes = [
+            models.Index(fields=['expiry_date']),
+            models.Index(fields=['date_created']),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -60,6 +89,12 @@ class Rating(models.Model):
     rating = models.CharField(max_length=7, choices=Rate.choices, default=Rate.LIKE)
     time_left_until_post_expiry = models.DurationField()
 
+    class Meta:
+        # the likes and dislikes of a post are counted by post and rating
+        indexes = [
+            models.Index(fields=['post', 'rating']),
+        ]
+
     def __str__(self):
         return self.rating
 
@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Cursor pagination for posts, newest first.
+    Each page is found through the index on date_created, rather than an offset,
+    so it is fetched just as quickly no matter how deep into the results it is.
+    """
+
+    ordering = '-date_created'
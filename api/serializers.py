@@ -1,10 +1,67 @@
+import copy
+from functools import lru_cache
+
+from django.db import connections, router, transaction
+from django.shortcuts import get_object_or_404
+from django.urls import get_script_prefix, reverse
 from django.utils import timezone
+from django.utils.duration import duration_string
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
 
 from .models import Comment, Post, Rating, Topic
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """
+    Mixin for ModelSerializers that builds the serializer's fields once per class.
+
+    ModelSerializer inspects the model and deep copies every declared field each time
+    a serializer is instantiated. Instead, the fields are built the first time they
+    are needed and each new serializer receives shallow copies of them.
+    """
+
+    def get_fields(self):
+        """
+        Returns copies of the fields cached on the serializer class, building them first
+        if this is the first time the serializer has been used.
+        """
+
+        cls = type(self)
+
+        # look up the cache on the class itself so subclasses don't share their parent's fields
+        if '_cached_fields' not in cls.__dict__:
+            cls._cached_fields = super().get_fields()
+
+        return {name: self._copy_field(field) for name, field in cls._cached_fields.items()}
+
+    @staticmethod
+    def _copy_field(field):
+        """
+        Returns a copy of the field that is safe to bind to a new serializer.
+        """
+
+        # fields that wrap other fields (nested serializers, many=True relations, lists)
+        # bind the inner field to themselves, so they still need a full copy
+        if isinstance(field, (serializers.BaseSerializer, ManyRelatedField)) or hasattr(field, 'child'):
+            return copy.deepcopy(field)
+
+        return copy.copy(field)
+
+    @cached_property
+    def _readable_fields(self):
+        """
+        Returns the fields used when serializing an object.
+
+        When serializing with many=True the same serializer is reused for every object,
+        so the readable fields are worked out once rather than once per object.
+        """
+
+        return [field for field in self.fields.values() if not field.write_only]
+
+
+class RatingSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Rating model.
     Must pass the request object and the post primary key to the constructor via context:
@@ -19,6 +76,16 @@ class RatingSerializer(serializers.ModelSerializer):
         model = Rating
         fields = ('id', 'username', 'post', 'rating', 'time_left_until_post_expiry')
         read_only_fields = ('post', 'time_left_until_post_expiry')
+
+    @cached_property
+    def _post(self):
+        """
+        Returns the post being rated, raising a 404 if it doesn't exist.
+        It is only fetched once, for both validating and creating the rating.
+        """
+
+        # only the owner's id is needed, so the owner itself isn't loaded
+        return get_object_or_404(Post.objects.cache().only('expiry_date', 'owner'), pk=self.context['post_pk'])
     
     def validate(self, data):
         """
@@ -29,16 +96,15 @@ class RatingSerializer(serializers.ModelSerializer):
         """
 
         user = self.context['request'].user
-        post = Post.objects.get(pk=self.context['post_pk'])
-        
+        post = self._post
 
-        if user == post.owner:
+        if user.pk == post.owner_id:
             raise serializers.ValidationError('A person cannot rate their own post.')
 
         if post.expiry_date < timezone.now():
             raise serializers.ValidationError('Cannot rate an expired post.')
         
-        if post.rating_set.filter(user=user).count():
+        if Rating.objects.filter(post_id=post.pk, user=user).exists():
             raise serializers.ValidationError('User has already rated this post.')
 
         return data
@@ -50,7 +116,7 @@ class RatingSerializer(serializers.ModelSerializer):
         """
 
         user = self.context['request'].user
-        post = Post.objects.get(pk=self.context['post_pk'])
+        post = self._post
         time_left_until_post_expiry = post.expiry_date - timezone.now()
 
         rating = Rating.objects.create(
@@ -63,7 +129,33 @@ class RatingSerializer(serializers.ModelSerializer):
         return rating
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentListSerializer(serializers.ListSerializer):
+    """
+    List serializer used for CommentSerializer when many=True.
+    Creates all of the comments with a single query where the database allows it.
+    """
+
+    def create(self, validated_data):
+        """
+        Builds a Comment object for each item of validated data and creates them all at once.
+        """
+
+        comments = [self.child.build_comment(attrs) for attrs in validated_data]
+        db = router.db_for_write(Comment)
+
+        if connections[db].features.can_return_rows_from_bulk_insert:
+            return Comment.objects.bulk_create(comments)
+
+        # other databases (e.g. SQLite) don't return the ids of bulk inserted rows, which
+        # the response needs, so the comments are saved one by one in a single transaction
+        with transaction.atomic(using=db):
+            for comment in comments:
+                comment.save()
+
+        return comments
+
+
+class CommentSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Comment model.
     Must pass the request object and the post primary key to the constructor via context:
@@ -79,40 +171,60 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ('id', 'username', 'post', 'comment', 'time_left_until_post_expiry')
         read_only_fields = ('post', 'time_left_until_post_expiry')
+        list_serializer_class = CommentListSerializer
+
+    @cached_property
+    def _post(self):
+        """
+        Returns the post being commented on, raising a 404 if it doesn't exist.
+        It is only fetched once, however many comments are validated and created.
+        """
+
+        return get_object_or_404(Post.objects.cache(), pk=self.context['post_pk'])
     
     def validate(self, data):
         """
         Checks that the post being rated isn't expired.
         """
 
-        post = Post.objects.get(pk=self.context['post_pk'])
+        post = self._post
 
         if post.expiry_date < timezone.now():
             raise serializers.ValidationError('Cannot rate an expired post.')
 
         return data
     
-    def create(self, validated_data):
+    def build_comment(self, validated_data):
         """
-        Sets the values for the user, post, and time_left_until_post_expiry before
-        creating a Comment object with the validated data.
+        Sets the values for the user, post, and time_left_until_post_expiry and
+        returns an unsaved Comment object with the validated data.
         """
 
         user = self.context['request'].user
-        post = Post.objects.get(pk=self.context['post_pk'])
+        post = self._post
         time_left_until_post_expiry = post.expiry_date - timezone.now()
 
-        comment = Comment.objects.create(
+        # the user object (rather than its id) is passed so it stays cached on the new
+        # object, meaning the 'username' in the response doesn't need another query
+        return Comment(
             user=user,
             post=post,
             time_left_until_post_expiry=time_left_until_post_expiry,
             **validated_data
         )
+
+    def create(self, validated_data):
+        """
+        Creates a Comment object with the validated data.
+        """
+
+        comment = self.build_comment(validated_data)
+        comment.save()
         
         return comment
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Post model.
     Must pass the request object to the constructor via context:
@@ -120,16 +232,18 @@ class PostSerializer(serializers.ModelSerializer):
     context={'request': request}
     """
 
+    # topics are referred to by their title rather than their id
+    topics = serializers.SlugRelatedField(many=True, slug_field='title', queryset=Topic.objects.all())
     # custom field for displaying the status of the post
     status = serializers.SerializerMethodField()
     # custom field for displaying the author's username
     author_username = serializers.ReadOnlyField(source='owner.username')
     # custom field for displaying the number of times the post has been rated with a like
-    likes = serializers.SerializerMethodField()
+    likes = serializers.IntegerField(source='likes_count', read_only=True)
     # custom field for displaying the number of times the post has been rated with a dislike
-    dislikes = serializers.SerializerMethodField()
+    dislikes = serializers.IntegerField(source='dislikes_count', read_only=True)
     # display the Comment objects associated with the Post object
-    comment_set = CommentSerializer(many=True, read_only=True)
+    comment_set = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -151,7 +265,7 @@ class PostSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Set the requesting user as the owner of the post before creating a Post object.
-        Add each topic passed through to the list of topics on the Post object.
+        Add the topics passed through to the list of topics on the Post object.
         """
 
         user = self.context['request'].user
@@ -162,8 +276,14 @@ class PostSerializer(serializers.ModelSerializer):
             **validated_data
         )
 
-        for topic in topics:
-            post.topics.add(topic)
+        # add all of the topics with a single insert
+        post.topics.add(*topics)
+
+        # a new post has no ratings yet and its expiry date has been validated to be
+        # in the future, so there is no need to query for these
+        post.likes_count = 0
+        post.dislikes_count = 0
+        post.is_expired = False
         
         return post
     
@@ -176,45 +296,92 @@ class PostSerializer(serializers.ModelSerializer):
         LIVE  = 'Live'
         EXPIRED = 'Expired'
 
-        if obj.expiry_date < timezone.now():
+        if obj.is_expired:
             return EXPIRED
         
         return LIVE
-    
-    def get_likes(self, obj):
-        """
-        Returns the value for the 'like' field.
-        Calculates and returns the number of times the post has been rated with a like.
-        """
-        
-        return obj.rating_set.filter(rating='LIKE').count()
 
-    def get_dislikes(self, obj):
+    def get_comment_set(self, obj):
         """
-        Returns the value for the dislike field.
-        Calculates and returns the number of times the post has been rated with a dislike.
+        Returns the value for the 'comment_set' field.
+        Builds the same representation as CommentSerializer directly from the post's
+        comments, which avoids running a nested serializer for every post.
         """
 
-        return obj.rating_set.filter(rating='DISLIKE').count()
+        return [
+            {
+                'id': comment.id,
+                'username': comment.user.username,
+                'post': comment.post_id,
+                'comment': comment.comment,
+                'time_left_until_post_expiry': duration_string(comment.time_left_until_post_expiry),
+            }
+            for comment in obj.comment_set.all()
+        ]
+
+
+# stands in for a topic's title in the cached topic url templates
+TOPIC_PLACEHOLDER = '__topic__'
+
 
+@lru_cache(maxsize=None)
+def topic_url_templates():
+    """
+    Returns the paths of the topic detail and topic posts urls with a placeholder in
+    place of the topic title. The urls are only reversed the first time this is called.
 
-class TopicSerializer(serializers.HyperlinkedModelSerializer):
+    reverse() adds the script prefix of the current thread, which can differ between
+    calls, so it is removed here and added back for each request by the caller.
+    """
+
+    prefix = get_script_prefix()
+
+    return (
+        reverse('topic-detail', kwargs={'pk': TOPIC_PLACEHOLDER})[len(prefix):],
+        reverse('topic-posts-list', kwargs={'topic_pk': TOPIC_PLACEHOLDER})[len(prefix):],
+    )
+
+
+class TopicSerializer(serializers.ModelSerializer):
     """
     Serializer for the Topic model.
+    Must pass the request object to the constructor via context:
+
+    context={'request': request}
     """
-    
+
+    # a url field to view the details of the given topic
+    url = serializers.SerializerMethodField()
     # a url field to the list of posts in the given topic
-    posts = serializers.HyperlinkedIdentityField(
-        view_name='topic-posts-list',
-        lookup_url_kwarg='topic_pk'
-    )
+    posts = serializers.SerializerMethodField()
 
     class Meta:
         model = Topic
         fields = ('title', 'url', 'posts',)
-        # specify the url to view the details of a given topic
-        # based on documentation: https://www.django-rest-framework.org/api-guide/serializers/#how-hyperlinked-views-are-determined
-        extra_kwargs = {
-            'url': {'view_name': 'topic-detail', 'lookup_field': 'pk'},
-        }
 
+    @cached_property
+    def _url_templates(self):
+        """
+        Returns the absolute 'url' and 'posts' url templates for this request.
+        Building them once per serializer means each topic's urls only need the title
+        substituting in.
+        """
+
+        request = self.context['request']
+        prefix = get_script_prefix()
+
+        return tuple(request.build_absolute_uri(prefix + template) for template in topic_url_templates())
+
+    def get_url(self, obj):
+        """
+        Returns the value for the 'url' field.
+        """
+
+        return self._url_templates[0].replace(TOPIC_PLACEHOLDER, obj.title)
+
+    def get_posts(self, obj):
+        """
+        Returns the value for the 'posts' field.
+        """
+
+        return self._url_templates[1].replace(TOPIC_PLACEHOLDER, obj.title)
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Topic
+from .views import TopicViewSet
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def clear_cached_topics(**kwargs):
+    """
+    Clears the cached topics whenever a topic is saved or deleted.
+    """
+
+    TopicViewSet._cached_topics.cache_clear()
@@ -1,3 +1,205 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import TOPIC_IDS, Comment, Post, Rating, Topic
+
+
+class TopicModelTests(TestCase):
+    """
+    Tests for the Topic model.
+    """
+
+    def test_id_is_derived_from_title(self):
+        """
+        A new topic gets the id that belongs to its title.
+        """
+
+        topic = Topic.objects.create(title='tech')
+
+        self.assertEqual(topic.pk, TOPIC_IDS['tech'])
+
+    def test_title_cannot_be_changed(self):
+        """
+        Changing the title of an existing topic is rejected rather than saving another row.
+        """
+
+        topic = Topic.objects.create(title='tech')
+        topic.title = 'sport'
+
+        with self.assertRaises(ValueError):
+            topic.save()
+
+        self.assertEqual(list(Topic.objects.values_list('title', flat=True)), ['tech'])
+
+
+class TopicListTests(TestCase):
+    """
+    Tests for listing topics through the 'topics/' url.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(username='user', password='password')
+
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def topic_titles(self):
+        response = self.client.get(reverse('topic-list'))
+
+        return [topic['title'] for topic in response.data]
+
+    def test_saving_a_topic_clears_the_cached_topics(self):
+        """
+        A topic created after the topics were cached is listed.
+        """
+
+        Topic.objects.create(title='tech')
+        self.assertEqual(self.topic_titles(), ['tech'])
+
+        Topic.objects.create(title='sport')
+        self.assertCountEqual(self.topic_titles(), ['sport', 'tech'])
+
+    def test_deleting_a_topic_clears_the_cached_topics(self):
+        """
+        A topic deleted after the topics were cached is no longer listed.
+        """
+
+        topic = Topic.objects.create(title='tech')
+        self.assertEqual(self.topic_titles(), ['tech'])
+
+        topic.delete()
+        self.assertEqual(self.topic_titles(), [])
+
+
+class CommentBulkCreateTests(TestCase):
+    """
+    Tests for creating several comments at once through the 'bulk/' url.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='password')
+        self.user = User.objects.create_user(username='commenter', password='password')
+        self.post = Post.objects.create(
+            title='Example Title',
+            message='Example message.',
+            owner=self.owner,
+            expiry_date=timezone.now() + timedelta(days=1),
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk_url(self, post_pk):
+        return reverse('post-comments-bulk', kwargs={'topic_pk': 'tech', 'post_pk': post_pk})
+
+    def test_creates_comments(self):
+        """
+        Every comment is created and returned with its id and the requester's username.
+        """
+
+        data = [{'comment': 'First comment.'}, {'comment': 'Second comment.'}]
+        response = self.client.post(self.bulk_url(self.post.pk), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(comment['id'] for comment in response.data),
+            sorted(Comment.objects.filter(post=self.post).values_list('id', flat=True)),
+        )
+        self.assertEqual([comment['username'] for comment in response.data], ['commenter', 'commenter'])
+
+    def test_creates_comments_with_bulk_insert(self):
+        """
+        Databases that return ids from a bulk insert create all the comments in one query.
+        """
+
+        data = [{'comment': 'First comment.'}, {'comment': 'Second comment.'}]
+
+        # only the serializer sees a database that supports it, as SQLite itself doesn't
+        with mock.patch('api.serializers.connections') as connections, \
+                mock.patch.object(Comment.objects, 'bulk_create', wraps=Comment.objects.bulk_create) as bulk_create:
+            connections.__getitem__.return_value.features.can_return_rows_from_bulk_insert = True
+            response = self.client.post(self.bulk_url(self.post.pk), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        bulk_create.assert_called_once()
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 2)
+
+    def test_empty_list_is_rejected(self):
+        response = self.client.post(self.bulk_url(self.post.pk), [], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_missing_post_returns_404(self):
+        response = self.client.post(self.bulk_url(self.post.pk + 1), [{'comment': 'Comment.'}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_expired_post_is_rejected(self):
+        """
+        No comments are created on an expired post.
+        """
+
+        self.post.expiry_date = timezone.now() - timedelta(days=1)
+        self.post.save()
+
+        response = self.client.post(self.bulk_url(self.post.pk), [{'comment': 'Comment.'}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Comment.objects.exists())
+
+
+class RatingCreateTests(TestCase):
+    """
+    Tests for rating a post through the 'ratings/' url.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='password')
+        self.user = User.objects.create_user(username='rater', password='password')
+        self.post = Post.objects.create(
+            title='Example Title',
+            message='Example message.',
+            owner=self.owner,
+            expiry_date=timezone.now() + timedelta(days=1),
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def ratings_url(self, post_pk):
+        return reverse('post-ratings-list', kwargs={'topic_pk': 'tech', 'post_pk': post_pk})
+
+    def test_creates_rating(self):
+        """
+        A rating is created for the post with the requester as its user.
+        """
+
+        response = self.client.post(self.ratings_url(self.post.pk), {'rating': 'DISLIKE'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['username'], 'rater')
+        self.assertEqual(response.data['post'], self.post.pk)
+        self.assertEqual(Rating.objects.get(pk=response.data['id']).rating, 'DISLIKE')
+
+    def test_own_post_is_rejected(self):
+        """
+        The owner of a post cannot rate it.
+        """
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(self.ratings_url(self.post.pk), {'rating': 'LIKE'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Rating.objects.exists())
+
+    def test_missing_post_returns_404(self):
+        response = self.client.post(self.ratings_url(self.post.pk + 1), {'rating': 'LIKE'}, format='json')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
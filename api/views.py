@@ -1,9 +1,13 @@
-from django.db.models import Count
+from functools import lru_cache
+
+from django.db.models import BooleanField, Case, Count, Prefetch, Q, Value, When
 from django.utils import timezone
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import Comment, Post, Rating, Topic
+from .models import TOPIC_IDS, Comment, Post, Rating, Topic
+from .pagination import PostCursorPagination
 from .serializers import CommentSerializer, PostSerializer, RatingSerializer, TopicSerializer
 
 
@@ -21,10 +25,36 @@ class TopicViewSet(viewsets.ModelViewSet):
     
     queryset = Topic.objects.all()
     serializer_class = TopicSerializer
+    # there are only four topics, so there is nothing to paginate
+    pagination_class = None
+    # topics are looked up by their title in the url, which is still named 'pk'
+    # so that the nested urls keep using 'topic_pk'
+    lookup_field = 'title'
+    lookup_url_kwarg = 'pk'
     # restrict what http request methods are allowed
     # taken from https://stackoverflow.com/questions/23639113/disable-a-method-in-a-viewset-django-rest-framework
     http_method_names = ['get', 'head', 'options']
 
+    def list(self, request, *args, **kwargs):
+        """
+        Reponsible for handling GET request method for the list of topics.
+        Serializes the cached topics rather than querying the database on every request.
+        """
+
+        serializer = self.get_serializer(self._cached_topics(), many=True)
+
+        return Response(serializer.data)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _cached_topics():
+        """
+        Returns every Topic object. The database is only queried the first time,
+        as the topics rarely change.
+        """
+
+        return tuple(Topic.objects.all())
+
 
 class PostViewSet(viewsets.ModelViewSet):
     """
@@ -61,9 +91,13 @@ class PostViewSet(viewsets.ModelViewSet):
     - interest=highest  -  to get the post with the highest number of ratings
     - interest=lowest  -  to get the post with the lowest number of ratings
 
+    Posts are returned newest first, a page at a time. Follow the 'next' and 'previous'
+    links in the response to move between pages.
+
     """
 
     serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
     http_method_names = ['get', 'post', 'head', 'options']
 
     def get_queryset(self):
@@ -77,27 +111,61 @@ class PostViewSet(viewsets.ModelViewSet):
             - interest=lowest
         """
 
+        # the topic's id is looked up from its title here, so the query only needs
+        # the table linking posts and topics rather than joining the topics too
+        topic_id = TOPIC_IDS.get(self.kwargs['topic_pk'])
+
+        if topic_id is None:
+            return Post.objects.none()
+
         # initial queryset filtered by topic
-        queryset = Post.objects.filter(topics=self.kwargs['topic_pk'])
+        queryset = Post.objects.filter(topics=topic_id)
 
         # optional query params
         status = self.request.query_params.get('status')
         interest = self.request.query_params.get('interest')
 
+        # the same time is used for every post, so the status filter and
+        # each post's status always agree
+        now = timezone.now()
+
         if status == 'expired':
-            queryset = queryset.filter(expiry_date__lt=timezone.now())
+            queryset = queryset.filter(expiry_date__lt=now)
         elif status == 'live':
-            queryset = queryset.filter(expiry_date__gte=timezone.now())
+            queryset = queryset.filter(expiry_date__gte=now)
 
         # interest level calculation solution based on code from
         # https://docs.djangoproject.com/en/3.1/topics/db/aggregation/#cheat-sheet
-        if interest == 'highest':
-            queryset = queryset.annotate(num_ratings=Count('rating')).order_by('-num_ratings')[:1]
-        elif interest == 'lowest':
-            queryset = queryset.annotate(num_ratings=Count('rating')).order_by('num_ratings')[:1]
+        # the post is picked in a subquery that only selects its id, leaving the outer
+        # query unsliced and free of the extra rating count
+        if interest in ('highest', 'lowest'):
+            ordering = '-num_ratings' if interest == 'highest' else 'num_ratings'
+            ranked = queryset.annotate(num_ratings=Count('rating')).order_by(ordering).values('id')[:1]
+            queryset = queryset.filter(id__in=ranked)
+
+        # calculate the like and dislike counts and whether the post has expired
+        # in the same query rather than once per post by the serializer
+        queryset = queryset.annotate(
+            likes_count=Count('rating', filter=Q(rating__rating='LIKE')),
+            dislikes_count=Count('rating', filter=Q(rating__rating='DISLIKE')),
+            is_expired=Case(
+                When(expiry_date__lt=now, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+
+        # load the owner, topics and comments (with their users) up front so that
+        # serializing the posts doesn't run extra queries for each post.
+        # only the username is needed from each user, so the rest of the row is skipped
+        comments = Comment.objects.select_related('user').only(
+            'id', 'post', 'comment', 'time_left_until_post_expiry', 'user__username',
+        )
+        queryset = queryset.select_related('owner').only(
+            'id', 'title', 'date_created', 'message', 'expiry_date', 'owner__username',
+        ).prefetch_related('topics', Prefetch('comment_set', queryset=comments))
 
         return queryset
-        
 
 
 class RatingViewSet(viewsets.ModelViewSet):
@@ -126,7 +194,9 @@ class RatingViewSet(viewsets.ModelViewSet):
         Returns Rating queryset that has been filtered by the 'post_pk' in the url.
         """
         
-        return Rating.objects.filter(post=self.kwargs['post_pk'])
+        return Rating.objects.filter(post=self.kwargs['post_pk']).order_by('id').select_related('user').only(
+            'id', 'post', 'rating', 'time_left_until_post_expiry', 'user__username',
+        )
 
     def create(self, request, *args, **kwargs):
         """
@@ -158,6 +228,15 @@ class CommentViewSet(viewsets.ModelViewSet):
         {
             "comment": "Example comment."
         }
+
+    Several comments can be created at once by posting a list of them to the 'bulk/' url.
+
+    **Example format for creating several new comments:**
+
+        [
+            {"comment": "First example comment."},
+            {"comment": "Second example comment."}
+        ]
     """
 
     queryset = Comment.objects.all()
@@ -169,7 +248,9 @@ class CommentViewSet(viewsets.ModelViewSet):
         Returns Comment queryset that has been filtered by the 'post_pk' in the url.
         """
 
-        return Comment.objects.filter(post=self.kwargs['post_pk'])
+        return Comment.objects.filter(post=self.kwargs['post_pk']).order_by('id').select_related('user').only(
+            'id', 'post', 'comment', 'time_left_until_post_expiry', 'user__username',
+        )
 
     def create(self, request, *args, **kwargs):
         """
@@ -190,3 +271,23 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Reponsible for handling POST request method for creating several comments at once.
+        Passes 'post_pk' in the url to the serializer.
+        """
+
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            context={
+                'request': request,
+                'post_pk': self.kwargs['post_pk']  # must explicitly pass to serializer
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
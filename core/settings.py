@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'oauth2_provider',
     'rest_framework',
+    'cacheops',
     'users',
     'api',
 ]
@@ -63,6 +64,9 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # paginate list endpoints so that large tables aren't serialized all at once
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 50,
 }
 
 AUTHENTICATION_BACKENDS = (
@@ -102,6 +106,24 @@ DATABASES = {
 }
 
 
+# Query caching
+# https://github.com/Suor/django-cacheops#setup
+
+CACHEOPS_REDIS = config('CACHEOPS_REDIS', default='redis://localhost:6379/1')
+
+# fall back to querying the database if redis is unavailable
+CACHEOPS_DEGRADE_ON_FAILURE = True
+
+# cached querysets are only invalidated when an object of a model listed here is saved
+# or deleted, so only lookups that don't depend on any other model are cached:
+#   - topics fetched one at a time by their title
+#   - posts fetched with .cache() when validating ratings and comments
+CACHEOPS = {
+    'api.topic': {'ops': 'get', 'timeout': 60 * 60},
+    'api.post': {'timeout': 60},
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 